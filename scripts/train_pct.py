@@ -7,17 +7,18 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import shutil
 import subprocess
 import sys
 import time
 import shlex
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # --- paths ------------------------------------------------------------
 ROOT = Path(__file__).resolve().parents[1]
 REPO = ROOT / 'repos' / 'Point-Transformers'
 DATA_DEFAULT = ROOT / 'datasets' / 'modelnet40_normal_resampled'
+CACHE_DIR = Path.home() / '.cache' / 'pointcloud-bench'
 
 # Show full Hydra tracebacks
 os.environ['HYDRA_FULL_ERROR'] = '1'
@@ -25,30 +26,220 @@ os.environ['HYDRA_FULL_ERROR'] = '1'
 
 def ensure_symlink(target: Path, link: Path) -> None:
     """Create/refresh `link` -> `target` symlink if needed."""
-    link.parent.mkdir(parents=True, exist_ok=True)
+    target_str = os.fspath(target)
+    name = link.name
     try:
-        if link.exists() or link.is_symlink():
+        # Open the parent once and do all link ops relative to it, so
+        # the kernel walks the directory path a single time.
+        try:
+            dir_fd = os.open(link.parent, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            link.parent.mkdir(parents=True, exist_ok=True)
+            dir_fd = os.open(link.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
             try:
-                if link.resolve() != target.resolve():
-                    link.unlink()
-                    link.symlink_to(target, target_is_directory=True)
+                # Fast path: one readlinkat instead of resolving both sides.
+                if os.readlink(name, dir_fd=dir_fd) == target_str:
+                    return
+                try:
+                    if os.path.samefile(link, target_str):
+                        return
+                except OSError:
+                    # Dangling link or target doesn't exist yet; just relink
+                    pass
+                os.unlink(name, dir_fd=dir_fd)
             except FileNotFoundError:
-                # If the target doesn't exist yet, just relink
-                link.unlink(missing_ok=True)
-                link.symlink_to(target, target_is_directory=True)
-        else:
-            link.symlink_to(target, target_is_directory=True)
+                pass
+            except OSError:
+                # Exists but is not a symlink; replace it
+                os.unlink(name, dir_fd=dir_fd)
+            try:
+                os.symlink(
+                    target_str, name,
+                    target_is_directory=True, dir_fd=dir_fd
+                )
+            except FileExistsError:
+                os.unlink(name, dir_fd=dir_fd)
+                os.symlink(
+                    target_str, name,
+                    target_is_directory=True, dir_fd=dir_fd
+                )
+        finally:
+            os.close(dir_fd)
     except OSError as e:
         print(f"[warn] Could not create symlink {link} -> {target}: {e}")
 
 
+def _git_rev_key(path: Path) -> str | None:
+    """Cheap cache key for the HEAD of `path`: (mtime_ns, size) of
+    `.git/HEAD` and, if HEAD is symbolic, of the referenced ref file."""
+    head = path / '.git' / 'HEAD'
+    try:
+        st = head.stat()
+        parts = [f'{st.st_mtime_ns}:{st.st_size}']
+        text = head.read_text().strip()
+        if text.startswith('ref: '):
+            try:
+                rst = (path / '.git' / text[5:]).stat()
+                parts.append(f'{rst.st_mtime_ns}:{rst.st_size}')
+            except OSError:
+                pass
+        return '|'.join(parts)
+    except OSError:
+        return None
+
+
+def _read_git_head(path: Path) -> str | None:
+    """Resolve HEAD by reading .git files directly — what `git rev-parse
+    HEAD` does in the common case, minus the fork+exec. Returns None when
+    the layout is unusual (e.g. worktrees, where .git is a file)."""
+    git_dir = path / '.git'
+    try:
+        text = (git_dir / 'HEAD').read_text().strip()
+        if not text.startswith('ref: '):
+            return text or None  # detached HEAD: the SHA itself
+        ref = text[5:]
+        try:
+            return (git_dir / ref).read_text().strip()
+        except FileNotFoundError:
+            pass
+        # Ref not loose; look it up in packed-refs
+        for line in (git_dir / 'packed-refs').read_text().splitlines():
+            if line.startswith(('#', '^')):
+                continue
+            sha, _, name = line.partition(' ')
+            if name == ref:
+                return sha
+        return None
+    except OSError:
+        return None
+
+
 def git_rev(path: Path) -> str:
+    cache_path = CACHE_DIR / 'gitrev.json'
+    key = _git_rev_key(path)
+    cache = {}
+    if key is not None:
+        try:
+            cache = json.loads(cache_path.read_text())
+        except (OSError, ValueError):
+            cache = {}
+        entry = cache.get(str(path))
+        if entry and entry.get('key') == key:
+            return entry['sha']
+    sha = _read_git_head(path)
+    if sha is None:
+        try:
+            sha = subprocess.check_output(
+                ['git', 'rev-parse', 'HEAD'], cwd=path
+            ).decode().strip()
+        except Exception:
+            return 'unknown'
+    if key is not None:
+        cache[str(path)] = {'key': key, 'sha': sha}
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(json.dumps(cache))
+        except OSError:
+            pass
+    return sha
+
+
+def torch_meta() -> dict:
+    """Collect torch/CUDA metadata for provenance without importing torch
+    in-process (the import costs ~1-2s and 200+ MB RSS just to read a few
+    version strings). Probes once in a subprocess and caches the result
+    keyed on the interpreter binary."""
+    cache_path = CACHE_DIR / 'torch_env.json'
+    try:
+        key = f'{sys.executable}:{os.stat(sys.executable).st_mtime_ns}'
+    except OSError:
+        key = sys.executable
     try:
-        return subprocess.check_output(
-            ['git', 'rev-parse', 'HEAD'], cwd=path
-        ).decode().strip()
+        cache = json.loads(cache_path.read_text())
+        if cache.get('key') == key:
+            return cache['meta']
+    except (OSError, ValueError):
+        pass
+    probe = (
+        'import torch, json; print(json.dumps({'
+        '"torch": torch.__version__, '
+        '"cuda_version": getattr(torch.version, "cuda", None), '
+        '"cuda_available": torch.cuda.is_available(), '
+        '"gpu_name": torch.cuda.get_device_name(0) '
+        'if torch.cuda.is_available() else None}))'
+    )
+    try:
+        meta = json.loads(
+            subprocess.check_output(
+                [sys.executable, '-c', probe], stderr=subprocess.DEVNULL
+            )
+        )
     except Exception:
-        return 'unknown'
+        # Cache the miss too, so torch-less envs don't fork a probe
+        # per launch
+        meta = {}
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({'key': key, 'meta': meta}))
+    except OSError:
+        pass
+    return meta
+
+
+def run_with_tee(
+    cmd_list: list[str], env: dict, cwd: Path, log_path: Path
+) -> int:
+    """Run the trainer, copying its merged stdout/stderr to both our
+    stdout and `log_path` (replaces shelling out to script(1))."""
+    log_fd = os.open(
+        log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+    )
+    try:
+        proc = subprocess.Popen(
+            cmd_list,
+            env=env,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0
+        )
+        out_fd = proc.stdout.fileno()
+        while True:
+            data = os.read(out_fd, 65536)
+            if not data:
+                break
+            os.write(1, data)
+            os.write(log_fd, data)
+        return proc.wait()
+    finally:
+        os.close(log_fd)
+
+
+def run_and_report(cmd_list: list[str], env: dict, cwd: Path) -> int:
+    """Run the trainer without tee'ing and report failures readably."""
+    rc = subprocess.call(cmd_list, env=env, cwd=cwd)
+    if rc != 0:
+        print(f"[error] trainer exited with code {rc}: "
+              f"{' '.join(shlex.quote(c) for c in cmd_list)}")
+    return rc
+
+
+def write_provenance(meta: dict, path: Path, pretty: bool) -> None:
+    if pretty:
+        payload = json.dumps(meta, indent=2)
+    else:
+        payload = json.dumps(meta, separators=(',', ':'))
+    with open(path, 'wb', buffering=65536) as f:
+        f.write(payload.encode())
+
+
+def run_trainer(cmd_list: list[str], env: dict, no_tee: bool,
+                log_path: Path) -> int:
+    print('>>>', ' '.join(shlex.quote(c) for c in cmd_list))
+    if no_tee:
+        return run_and_report(cmd_list, env, REPO)
+    return run_with_tee(cmd_list, env, REPO, log_path)
 
 
 def main():
@@ -59,6 +250,28 @@ def main():
         default=None,
         help='Output directory (default: runs/pct/<timestamp>)'
     )
+    ap.add_argument(
+        '--batch',
+        type=Path,
+        default=None,
+        help='JSONL file of Hydra override sets (each line a JSON list); '
+        'runs them all from this one warm launcher process'
+    )
+    ap.add_argument(
+        '--no-tee',
+        action='store_true',
+        help='Do not capture output to train.log'
+    )
+    ap.add_argument(
+        '--pretty-json',
+        action='store_true',
+        help='Indent provenance.json for human reading'
+    )
+    ap.add_argument(
+        '--no-torch-meta',
+        action='store_true',
+        help='Skip probing torch for provenance metadata'
+    )
     ap.add_argument(
         '--data',
         type=Path,
@@ -84,27 +297,24 @@ def main():
     out = args.out or (ROOT / 'runs' / 'pct' / ts)
     out.mkdir(parents=True, exist_ok=True)
 
-    # 2) Provenance
+    # 2) Provenance. The SHA lookups and the torch probe are independent
+    # and subprocess/IO-bound, so overlap them instead of paying their
+    # latencies back to back.
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        f_repo = ex.submit(git_rev, REPO)
+        f_root = ex.submit(git_rev, ROOT)
+        f_torch = None if args.no_torch_meta else ex.submit(torch_meta)
     meta = {
         'model': 'Point-Transformers (PCT variant)',
         'repo_path': str(REPO),
-        'repo_commit': git_rev(REPO),
-        'bench_commit': git_rev(ROOT),
+        'repo_commit': f_repo.result(),
+        'bench_commit': f_root.result(),
         'time': time.strftime('%Y-%m-%d %H:%M:%S'),
         'argv': sys.argv,
         'python': sys.version
     }
-    try:
-        import torch  # type: ignore
-        meta.update({
-            'torch': torch.__version__,
-            'cuda_version': getattr(torch.version, 'cuda', None),
-            'cuda_available': torch.cuda.is_available(),
-            'gpu_name': torch.cuda.get_device_name(0) if torch.cuda.is_available() else None, # noqa
-        })
-    except Exception:
-        pass
-    (out / 'provenance.json').write_text(json.dumps(meta, indent=2))
+    if f_torch is not None:
+        meta.update(f_torch.result())
 
     # 3) Dataset symlink so hardcoded repo paths resolve
     if not args.no_symlink:
@@ -114,23 +324,45 @@ def main():
     extra = list(args.extra)
     if extra and extra[0] == '--':
         extra = extra[1:]
-    cmd_list = [sys.executable, '-u', 'train_cls.py', *extra]
 
-    # 5) Run, log
     env = os.environ.copy()
-    log_path = (out / 'train.log').resolve()
-    os.chdir(REPO)
-    script_bin = shutil.which('script')
-    if script_bin:
-        cmd_str = ' '.join(shlex.quote(c) for c in cmd_list)
-        run_cmd = [script_bin, '-q', '-f', str(log_path), '-c', cmd_str]
-        print('>>>', ' '.join(run_cmd))
-        rc = subprocess.call(run_cmd, env=env)
-        sys.exit(rc)
+
+    # 5) Run, log
+    if args.batch:
+        # One warm launcher process amortizes startup, provenance
+        # collection and argparse over the whole sweep.
+        rc_final = 0
+        k = 0
+        for line in args.batch.read_text().splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            overrides = json.loads(line)
+            cmd_list = [
+                sys.executable, '-u', 'train_cls.py', *extra, *overrides
+            ]
+            run_out = out / f'run_{k}'
+            run_out.mkdir(parents=True, exist_ok=True)
+            run_meta = dict(
+                meta,
+                argv=cmd_list,
+                time=time.strftime('%Y-%m-%d %H:%M:%S')
+            )
+            write_provenance(
+                run_meta, run_out / 'provenance.json', args.pretty_json
+            )
+            rc = run_trainer(
+                cmd_list, env, args.no_tee,
+                (run_out / 'train.log').resolve()
+            )
+            rc_final = rc_final or rc
+            k += 1
+        sys.exit(rc_final)
     else:
-        print("[warn] 'script' not found; running without tee (no train.log).")
-        print('>>>', ' '.join(cmd_list))
-        os.execvpe(cmd_list[0], cmd_list, env)
+        write_provenance(meta, out / 'provenance.json', args.pretty_json)
+        cmd_list = [sys.executable, '-u', 'train_cls.py', *extra]
+        log_path = (out / 'train.log').resolve()
+        sys.exit(run_trainer(cmd_list, env, args.no_tee, log_path))
 
 
 if __name__ == '__main__':